@@ -0,0 +1,265 @@
+# aggregator.py
+# Out-of-core aggregation of classified accounts - streams files in shards
+
+import argparse
+import json
+import os
+import struct
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from vectorizer import (
+    add_account_to_vector,
+    normalize_interest_vector,
+    compute_metrics_from_vector,
+    jsonable
+)
+
+# Compact binary format: 8-byte header, then fixed-size records so that
+# shards can start at any record boundary.
+#   target_username  32s  (UTF-8, NUL padded; Instagram caps usernames at 30)
+#   primary          b    (index into config.ALLOWED_CATEGORIES)
+#   secondary        b    (index, or -1 for none)
+#   from_instagram   d    (float64, so results match the JSONL path exactly)
+#   from_bio         d
+#   verified         ?
+BINARY_PREFIX = b"IGCA"
+BINARY_MAGIC = BINARY_PREFIX + b"\x02\x00\x00\x00"
+RECORD = struct.Struct("<32sbbdd?")
+
+CHUNK_RECORDS = 4096  # Binary records decoded per read
+
+_CATEGORY_INDEX = {c: i for i, c in enumerate(config.ALLOWED_CATEGORIES)}
+
+
+def _category_index(category):
+    if not category or category == "null":
+        return -1
+    if category not in _CATEGORY_INDEX:
+        raise ValueError(f"Category not in taxonomy: {category}")
+    return _CATEGORY_INDEX[category]
+
+
+def write_binary(records, path, group_key="target_username"):
+    """
+    Write classified accounts to the compact binary format.
+    records: iterable of classified accounts (as from classify_all_accounts)
+    carrying a `group_key` field. Returns number of records written.
+    """
+    count = 0
+
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC)
+
+        for record in records:
+            target = record[group_key].encode("utf-8")
+            if len(target) > 32:
+                raise ValueError(f"Target username too long: {record[group_key]}")
+
+            classification = record["classification"]
+            signals = classification["signals"]
+
+            f.write(RECORD.pack(
+                target,
+                _category_index(classification["primary_category"]),
+                _category_index(classification.get("secondary_category")),
+                signals.get("from_instagram_category", 0.0),
+                signals.get("from_bio", 0.0),
+                bool(record.get("verified", False))
+            ))
+            count += 1
+
+    return count
+
+
+def jsonl_to_binary(jsonl_path, binary_path, group_key="target_username"):
+    """Convert a JSONL file of classified accounts to the binary format"""
+    return write_binary(_iter_jsonl(jsonl_path, 0, None), binary_path, group_key)
+
+
+def _is_binary(path):
+    with open(path, "rb") as f:
+        header = f.read(len(BINARY_MAGIC))
+
+    if header.startswith(BINARY_PREFIX) and header != BINARY_MAGIC:
+        raise ValueError(f"{path}: unsupported binary format version, rewrite it with write_binary")
+    return header == BINARY_MAGIC
+
+
+def _iter_jsonl(path, start, end):
+    """
+    Yield records whose line starts in [start, end).
+    A shard not starting at 0 skips its first (partial) line, which
+    belongs to the previous shard.
+    """
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # Finish the line that straddles the boundary
+
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_binary(path, start, end):
+    """Yield (target, classification, verified) for records in [start, end)"""
+    categories = config.ALLOWED_CATEGORIES
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+
+        while remaining > 0:
+            chunk = f.read(min(remaining, CHUNK_RECORDS * RECORD.size))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+            for target, primary, secondary, ig, bio, verified in RECORD.iter_unpack(chunk):
+                classification = {
+                    "primary_category": categories[primary],
+                    "secondary_category": categories[secondary] if secondary >= 0 else None,
+                    "signals": {"from_instagram_category": ig, "from_bio": bio}
+                }
+                yield target.rstrip(b"\0").decode("utf-8"), classification, verified
+
+
+def _new_partial():
+    return {"vector": defaultdict(float), "verified": 0, "total": 0}
+
+
+def aggregate_shard(shard, group_key="target_username"):
+    """
+    Accumulate raw per-target sums for one shard.
+    shard: (path, start_byte, end_byte, is_binary)
+    Returns: {target: {"vector": {category: raw_weight}, "verified": n, "total": n}}
+    """
+    path, start, end, is_binary = shard
+    partials = defaultdict(_new_partial)
+
+    if is_binary:
+        rows = _iter_binary(path, start, end)
+    else:
+        rows = (
+            (r[group_key], r["classification"], r.get("verified", False))
+            for r in _iter_jsonl(path, start, end)
+        )
+
+    for target, classification, verified in rows:
+        partial = partials[target]
+        add_account_to_vector(partial["vector"], classification)
+        partial["total"] += 1
+        if verified:
+            partial["verified"] += 1
+
+    # Plain dicts pickle cheaply back to the parent process
+    return {
+        target: {**p, "vector": dict(p["vector"])}
+        for target, p in partials.items()
+    }
+
+
+def merge_partials(into, partials):
+    """Add one shard's partial sums into the running totals"""
+    for target, p in partials.items():
+        total = into[target]
+        for category, weight in p["vector"].items():
+            total["vector"][category] += weight
+        total["verified"] += p["verified"]
+        total["total"] += p["total"]
+
+    return into
+
+
+def plan_shards(paths, shard_bytes=config.STREAM_SHARD_BYTES):
+    """Split input files into (path, start, end, is_binary) byte ranges"""
+    shards = []
+
+    for path in paths:
+        size = os.path.getsize(path)
+        is_binary = _is_binary(path)
+
+        if is_binary:
+            if (size - len(BINARY_MAGIC)) % RECORD.size:
+                raise ValueError(
+                    f"{path}: size is not a whole number of {RECORD.size}-byte records "
+                    "(truncated or not written by write_binary)"
+                )
+
+            # Keep shard boundaries on record boundaries
+            start = len(BINARY_MAGIC)
+            step = max(1, shard_bytes // RECORD.size) * RECORD.size
+        else:
+            start = 0
+            step = max(1, shard_bytes)
+
+        while start < size:
+            end = min(start + step, size)
+            shards.append((path, start, end, is_binary))
+            start = end
+
+    return shards
+
+
+def aggregate_files(paths, workers=None, shard_bytes=config.STREAM_SHARD_BYTES,
+                    group_key="target_username"):
+    """
+    Stream classified accounts from JSONL / binary files and compute
+    compute_all_metrics-equivalent output per target user.
+    Memory is bounded by the number of targets, not the number of accounts.
+    Returns: {target: {interest_vector, metrics}}
+    """
+    shards = plan_shards(paths, shard_bytes)
+    totals = defaultdict(_new_partial)
+
+    if workers == 1 or len(shards) <= 1:
+        for shard in shards:
+            merge_partials(totals, aggregate_shard(shard, group_key))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partials in pool.map(aggregate_shard, shards, [group_key] * len(shards)):
+                merge_partials(totals, partials)
+
+    results = {}
+    for target, total in totals.items():
+        interest_vector = normalize_interest_vector(total["vector"])
+        celebrity_ratio = round(total["verified"] / total["total"], 2) if total["total"] else 0.0
+
+        results[target] = {
+            "interest_vector": interest_vector,
+            "metrics": compute_metrics_from_vector(interest_vector, celebrity_ratio)
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate classified-account files per target user")
+    parser.add_argument("paths", nargs="+", help="JSONL or binary classified-account files")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-mb", type=int, default=config.STREAM_SHARD_BYTES // (1024 * 1024))
+    parser.add_argument("--archive", default=None, help="Append results to this result archive")
+    args = parser.parse_args()
+
+    results = aggregate_files(args.paths, args.workers, args.shard_mb * 1024 * 1024)
+
+    if args.archive:
+        from archive import ResultArchiveWriter
+        ResultArchiveWriter(args.archive).append_many(
+            (target, r["interest_vector"], r["metrics"])
+            for target, r in sorted(results.items())
+        )
+        return
+
+    for target, result in sorted(results.items()):
+        print(json.dumps(jsonable({"target_username": target, **result})))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# archive.py
+# Columnar result archive - one .npy file per column plus a JSONL index
+
+import fcntl
+import json
+import os
+import time
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+import config
+
+# Layout of an archive directory:
+#   meta.json        category and metric column order
+#   index.jsonl      one line per row: {target_username, created_at}
+#   interest.npy     float32 (rows, len(categories)) - percentages
+#   <metric>.npy     float64 (rows,) - one file per metric
+# index.jsonl is written last, so it defines how many column rows are valid.
+# Appends hold an exclusive flock on .lock, so several writers (main.py,
+# server.py, aggregator.py) can share one archive.
+METRIC_COLUMNS = [
+    "diversity_index",
+    "knowledge_entertainment_ratio",
+    "celebrity_ratio",
+    "skewness"
+]
+
+INTEREST_COLUMN = "interest"
+
+
+def _count_index_rows(path):
+    index_path = os.path.join(path, "index.jsonl")
+    if not os.path.exists(index_path):
+        return 0
+    with open(index_path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+def _append_npy(path, rows, valid_rows):
+    """
+    Append rows along axis 0 of an .npy file without rewriting existing data.
+    NumPy pads .npy headers so the shape can grow in place.
+    Rows past valid_rows (left by an interrupted append) are overwritten.
+    """
+    if not os.path.exists(path) or valid_rows == 0:
+        np.save(path, rows)
+        return
+
+    with open(path, "r+b") as f:
+        version = npy_format.read_magic(f)
+        if version != (1, 0):
+            raise ValueError(f"Unsupported .npy version {version} in {path}")
+
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+        header_len = f.tell()
+
+        if fortran_order or dtype != rows.dtype or shape[1:] != rows.shape[1:]:
+            raise ValueError(f"Column layout mismatch in {path}")
+        if shape[0] < valid_rows:
+            raise ValueError(f"Column {path} is shorter than the index")
+
+        row_bytes = dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64))
+        f.seek(header_len + valid_rows * row_bytes)
+        f.write(np.ascontiguousarray(rows).tobytes())
+        f.truncate()
+
+        f.seek(0)
+        npy_format.write_array_header_1_0(f, {
+            "descr": npy_format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (valid_rows + rows.shape[0],) + shape[1:]
+        })
+        if f.tell() != header_len:
+            raise ValueError(f"Header of {path} cannot grow in place")
+
+
+class ResultArchiveWriter:
+    """
+    Appends per-user analysis results to an archive directory.
+    Existing columns are extended in place, never rewritten.
+    Safe to use alongside other writers on the same directory.
+    """
+
+    def __init__(self, path, categories=None):
+        self.path = path
+        self.categories = list(categories or config.ALLOWED_CATEGORIES)
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["categories"] != self.categories or meta["metrics"] != METRIC_COLUMNS:
+                raise ValueError(f"Archive {path} was written with a different taxonomy")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"categories": self.categories, "metrics": METRIC_COLUMNS}, f)
+
+    def append(self, target_username, interest_vector, metrics):
+        """Append a single analysis result"""
+        self.append_many([(target_username, interest_vector, metrics)])
+
+    def append_many(self, results):
+        """
+        Append several results with one write per column.
+        results: iterable of (target_username, interest_vector, metrics)
+        """
+        results = list(results)
+        if not results:
+            return
+
+        interest = np.zeros((len(results), len(self.categories)), dtype=np.float32)
+        metric_values = {name: np.empty(len(results), dtype=np.float64) for name in METRIC_COLUMNS}
+        index_lines = []
+        created_at = time.time()
+
+        for row, (target_username, interest_vector, metrics) in enumerate(results):
+            for col, category in enumerate(self.categories):
+                interest[row, col] = interest_vector.get(category, 0.0)
+            for name in METRIC_COLUMNS:
+                metric_values[name][row] = metrics[name]
+            index_lines.append(json.dumps({
+                "target_username": target_username,
+                "created_at": created_at
+            }))
+
+        with open(os.path.join(self.path, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # Released when the file closes
+
+            # Another writer may have appended since our last call
+            valid_rows = _count_index_rows(self.path)
+
+            _append_npy(os.path.join(self.path, f"{INTEREST_COLUMN}.npy"), interest, valid_rows)
+            for name, values in metric_values.items():
+                _append_npy(os.path.join(self.path, f"{name}.npy"), values, valid_rows)
+
+            with open(os.path.join(self.path, "index.jsonl"), "a") as f:
+                f.write("\n".join(index_lines) + "\n")
+
+
+class ResultArchive:
+    """
+    Read-only, memory-mapped view of an archive directory.
+    Columns are np.memmap-backed, so slicing and filtering only touch
+    the pages that are actually read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.categories = meta["categories"]
+        self.metric_names = meta["metrics"]
+
+        self.index = []
+        index_path = os.path.join(path, "index.jsonl")
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                for line in f:
+                    if line.strip():
+                        self.index.append(json.loads(line))
+
+        rows = len(self.index)
+        self.targets = np.array([entry["target_username"] for entry in self.index])
+        self.interest = self._load(INTEREST_COLUMN, rows)
+        self.metrics = {name: self._load(name, rows) for name in self.metric_names}
+
+    def _load(self, name, rows):
+        column_path = os.path.join(self.path, f"{name}.npy")
+        if not os.path.exists(column_path):
+            width = (len(self.categories),) if name == INTEREST_COLUMN else ()
+            return np.zeros((0,) + width)
+
+        # Columns may hold rows of an append whose index line was never written
+        return np.load(column_path, mmap_mode="r")[:rows]
+
+    def __len__(self):
+        return len(self.index)
+
+    def category(self, name):
+        """Interest column for one category (percentages, one value per row)"""
+        return self.interest[:, self.categories.index(name)]
+
+    def where(self, column, min_value=None, max_value=None):
+        """Boolean row mask for a metric or category column within [min, max]"""
+        values = self.metrics[column] if column in self.metrics else self.category(column)
+        mask = np.ones(len(self), dtype=bool)
+
+        if min_value is not None:
+            mask &= values >= min_value
+        if max_value is not None:
+            mask &= values <= max_value
+
+        return mask
+
+    def rows_for(self, target_username):
+        """Row numbers of all runs for a target, oldest first"""
+        return np.flatnonzero(self.targets == target_username)
+
+    def result(self, row):
+        """Rebuild the {interest_vector, metrics} dict for one row"""
+        interest_vector = {
+            category: float(value)
+            for category, value in zip(self.categories, self.interest[row])
+            if value > 0
+        }
+        metrics = {name: float(values[row]) for name, values in self.metrics.items()}
+
+        return {
+            "target_username": self.index[row]["target_username"],
+            "created_at": self.index[row]["created_at"],
+            "interest_vector": interest_vector,
+            "metrics": metrics
+        }
@@ -0,0 +1,152 @@
+# cascade.py
+# Model cascade - cheap model first, escalate to larger models on low confidence
+
+import threading
+import time
+import config
+
+_default_cascade = None
+_default_lock = threading.Lock()
+
+
+class ModelCascade:
+    """
+    Ordered tiers of models, cheapest first.
+    Each call goes to the first tier; the response is scored by the
+    caller's `accept` function and escalated to the next tier when the
+    score is below the threshold, the score raises (e.g. failed taxonomy
+    validation) or the model call itself fails. If no tier reaches the
+    threshold, the highest-scoring valid response from any tier is
+    returned, so escalating never makes a result worse.
+    """
+
+    def __init__(self, tiers, threshold=config.CASCADE_CONFIDENCE_THRESHOLD):
+        """
+        tiers: list of (name, model) - any model with generate_content(prompt) -> .text
+        """
+        if not tiers:
+            raise ValueError("ModelCascade needs at least one tier")
+
+        self.tiers = list(tiers)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._stats = new_stats(self)
+
+    @classmethod
+    def from_config(cls):
+        """Gemini tiers named in config.CASCADE_MODELS"""
+        import google.generativeai as genai
+        genai.configure(api_key=config.GEMINI_API_KEY)
+
+        return cls([(name, genai.GenerativeModel(name)) for name in config.CASCADE_MODELS])
+
+    def generate_content(self, prompt, accept=None, stats=None, first_tier=0):
+        """
+        Run prompt through the cascade.
+        accept: optional callable(text) -> score in 0.0-1.0; without it,
+        any non-empty response is accepted.
+        stats: optional dict from new_stats() that also receives this call's counts.
+        first_tier: tier to start at (-1 = largest model only).
+        """
+        tiers = self.tiers[first_tier % len(self.tiers):]
+        best_score, best_response = None, None
+        last_response, last_error = None, None
+
+        for position, (name, model) in enumerate(tiers):
+            is_last = position == len(tiers) - 1
+            start = time.perf_counter()
+
+            try:
+                response = model.generate_content(prompt)
+                error = None
+            except Exception as e:
+                response = None
+                error = e
+
+            self._record(stats, name, "total_seconds", time.perf_counter() - start)
+            self._record(stats, name, "calls")
+
+            if error is not None:
+                self._record(stats, name, "errors")
+                last_error = error
+            else:
+                last_response = response
+                score = self._score(response, accept)
+
+                if score is not None and score >= self.threshold:
+                    return response
+
+                # Ties go to the later, larger model
+                if score is not None and (best_score is None or score >= best_score):
+                    best_score, best_response = score, response
+
+            if not is_last:
+                self._record(stats, name, "escalations")
+
+        if best_response is not None:
+            return best_response
+        if last_response is not None:
+            return last_response  # Nothing valid; let the caller fall back
+        raise last_error
+
+    @staticmethod
+    def _score(response, accept):
+        """Score of a response as a float, or None if it is invalid"""
+        try:
+            if accept is None:
+                return 1.0 if response.text.strip() else None
+            # e.g. "confidence": "0.9" scores 0.9; a non-numeric score is invalid
+            return float(accept(response.text))
+        except Exception:
+            return None
+
+    def _record(self, stats, name, key, amount=1):
+        with self._lock:
+            self._stats[name][key] += amount
+            if stats is not None:
+                stats[name][key] += amount
+
+    def report(self, stats=None):
+        """Per-tier call counts, escalations and latency (lifetime, or of `stats`)"""
+        with self._lock:
+            stats = stats if stats is not None else self._stats
+            return {
+                name: {
+                    **tier,
+                    "total_seconds": round(tier["total_seconds"], 3),
+                    "avg_seconds": round(tier["total_seconds"] / tier["calls"], 3) if tier["calls"] else 0.0
+                }
+                for name, tier in stats.items()
+            }
+
+    def print_report(self, stats=None):
+        for name, tier in self.report(stats).items():
+            print(
+                f"  {name:20} calls: {tier['calls']:4}  escalated: {tier['escalations']:4}  "
+                f"avg: {tier['avg_seconds']:.2f}s"
+            )
+
+
+def new_stats(cascade):
+    """Empty per-tier counters, for tracking one run's calls"""
+    return {
+        name: {"calls": 0, "escalations": 0, "errors": 0, "total_seconds": 0.0}
+        for name, _ in cascade.tiers
+    }
+
+
+def get_default_cascade():
+    """Shared Gemini cascade used by classifier and inference"""
+    global _default_cascade
+
+    with _default_lock:
+        if _default_cascade is None:
+            _default_cascade = ModelCascade.from_config()
+        return _default_cascade
+
+
+def generate(llm, prompt, accept=None, stats=None, first_tier=0):
+    """Call llm, passing the cascade options through only if it is a cascade"""
+    if isinstance(llm, ModelCascade):
+        return llm.generate_content(prompt, accept=accept, stats=stats, first_tier=first_tier)
+    return llm.generate_content(prompt)
@@ -1,19 +1,45 @@
 # classifier.py
 # Gemini-based classification - always used, even if Instagram category exists
 
-import google.generativeai as genai
 import json
 import config
+from cascade import ModelCascade, get_default_cascade, generate, new_stats
 
-genai.configure(api_key=config.GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-pro')
 
-def classify_account(account):
+def parse_classification(result_text):
+    """
+    Parse and validate a classification response.
+    Raises if it is not valid JSON or uses categories outside the taxonomy.
+    """
+    result_text = result_text.strip()
+    
+    # Clean JSON (remove markdown if present)
+    if "```json" in result_text:
+        result_text = result_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in result_text:
+        result_text = result_text.split("```")[1].split("```")[0].strip()
+    
+    result = json.loads(result_text)
+    
+    # Validate (explicit raises: the cascade escalates on them, even under python -O)
+    if result["primary_category"] not in config.ALLOWED_CATEGORIES:
+        raise ValueError(f"Primary category not in taxonomy: {result['primary_category']}")
+    if result["secondary_category"] and result["secondary_category"] not in config.ALLOWED_CATEGORIES:
+        raise ValueError(f"Secondary category not in taxonomy: {result['secondary_category']}")
+    
+    return result
+
+
+def classify_account(account, llm=None, stats=None):
     """
     Classify a single account using Gemini.
     Input: {username, bio, category, verified}
     Output: {primary_category, secondary_category, signals, confidence}
+    llm: any object with generate_content(prompt) -> .text (defaults to the
+    Gemini cascade; low-confidence or invalid results escalate a tier)
+    stats: optional cascade.new_stats() dict collecting this run's tier counts
     """
+    llm = llm or get_default_cascade()
     
     prompt = f"""You are a precise category classifier. Analyze the following Instagram account data and return ONLY valid JSON.
 
@@ -50,23 +76,13 @@ OUTPUT FORMAT (JSON only, no explanation):
 }}"""
 
     try:
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # Clean JSON (remove markdown if present)
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0].strip()
-        
-        result = json.loads(result_text)
+        response = generate(
+            llm, prompt,
+            accept=lambda text: parse_classification(text)["confidence"],
+            stats=stats
+        )
         
-        # Validate
-        assert result["primary_category"] in config.ALLOWED_CATEGORIES
-        if result["secondary_category"]:
-            assert result["secondary_category"] in config.ALLOWED_CATEGORIES
-        
-        return result
+        return parse_classification(response.text)
         
     except Exception as e:
         print(f"  ⚠️ Classification error for @{account['username']}: {e}")
@@ -82,15 +98,19 @@ OUTPUT FORMAT (JSON only, no explanation):
         }
 
 
-def classify_all_accounts(accounts):
+def classify_all_accounts(accounts, llm=None):
     """Classify all accounts and return enriched data"""
     classified = []
     
+    # Count this run's calls only; the cascade may be shared with other jobs
+    cascade = llm or get_default_cascade()
+    stats = new_stats(cascade) if isinstance(cascade, ModelCascade) else None
+    
     print("\n🧠 Classifying accounts with Gemini...")
     for i, account in enumerate(accounts, 1):
         print(f"  {i}/{len(accounts)}: @{account['username']}")
         
-        classification = classify_account(account)
+        classification = classify_account(account, llm, stats)
         
         # Merge with original account data
         enriched = {
@@ -100,5 +120,8 @@ def classify_all_accounts(accounts):
         
         classified.append(enriched)
     
+    if stats is not None:
+        cascade.print_report(stats)
+    
     print("✅ Classification complete\n")
     return classified
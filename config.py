@@ -47,6 +47,15 @@ ALLOWED_CATEGORIES = [
     "Other"
 ]
 
+# Model cascade: cheapest first; results below the threshold or failing
+# taxonomy validation are retried on the next model
+CASCADE_MODELS = [
+    m.strip()
+    for m in os.getenv("CASCADE_MODELS", "gemini-1.5-flash,gemini-pro").split(",")
+    if m.strip()
+]
+CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", "0.6"))
+
 # Signal weights
 INSTAGRAM_CATEGORY_WEIGHT = 0.6
 BIO_WEIGHT = 0.4
@@ -67,3 +76,25 @@ ENTERTAINMENT_CATEGORIES = [
 
 # Scraping limits
 MAX_FOLLOWING_TO_SCRAPE = 100  # Limit for educational purposes
+
+# Profile registry: seconds before a shared profile is refetched
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "3600"))
+
+# Following dialog scrolling (pixels / seconds)
+SCROLL_STEP_MIN = 300
+SCROLL_STEP_MAX = 4000
+SCROLL_PAUSE = 0.25  # After a scroll that loaded new entries
+SCROLL_STALE_PAUSE = 1.0  # After a scroll that loaded nothing
+
+# Result archive directory (archive.py) - results are only saved when set
+RESULT_ARCHIVE_DIR = os.getenv("RESULT_ARCHIVE_DIR")
+
+# Streaming aggregation (aggregator.py)
+STREAM_SHARD_BYTES = 64 * 1024 * 1024  # Bytes of input per process-pool task
+
+# HTTP service (server.py)
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "2"))  # Concurrent analyses
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", "50"))  # Pending jobs before rejecting
+SERVICE_JOB_HISTORY = int(os.getenv("SERVICE_JOB_HISTORY", "200"))  # Finished jobs kept in memory
@@ -1,17 +1,16 @@
 # inference.py
 # Gemini inference layer - receives ONLY numbers, generates probabilistic text
 
-import google.generativeai as genai
-import config
+from cascade import get_default_cascade, generate
 
-genai.configure(api_key=config.GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-pro')
-
-def generate_summary(interest_vector, metrics):
+def generate_summary(interest_vector, metrics, llm=None):
     """
     Generate 2-3 sentence probabilistic summary from numeric data only.
     NO usernames, NO diagnosis, NO judgments.
+    llm: any object with generate_content(prompt) -> .text (defaults to the
+    Gemini cascade; summaries always use its largest model)
     """
+    llm = llm or get_default_cascade()
     
     # Prepare numeric input (top categories only)
     top_categories = dict(sorted(
@@ -45,7 +44,7 @@ EXAMPLE OUTPUT:
 YOUR SUMMARY:"""
 
     try:
-        response = model.generate_content(prompt)
+        response = generate(llm, prompt, first_tier=-1)
         summary = response.text.strip()
         
         # Remove any quotes if present
@@ -58,13 +57,13 @@ YOUR SUMMARY:"""
         return "Unable to generate summary due to API limitations."
 
 
-def generate_full_report(interest_vector, metrics):
+def generate_full_report(interest_vector, metrics, llm=None):
     """
     Generate complete textual report with disclaimers.
     """
     print("✍️ Generating summary with Gemini...\n")
     
-    summary = generate_summary(interest_vector, metrics)
+    summary = generate_summary(interest_vector, metrics, llm)
     
     confidence_note = (
         "Note: This analysis is based on publicly visible following patterns and "
@@ -131,6 +131,13 @@ def main():
         print("   - interest_bar.png")
         print("   - interest_radar.png")
         
+        if config.RESULT_ARCHIVE_DIR:
+            from archive import ResultArchiveWriter
+            ResultArchiveWriter(config.RESULT_ARCHIVE_DIR).append(
+                target_username, interest_vector, metrics
+            )
+            print(f"   - {config.RESULT_ARCHIVE_DIR}/ (result archive)")
+        
     except KeyboardInterrupt:
         print("\n\n⚠️ Analysis interrupted by user")
     except Exception as e:
@@ -0,0 +1,114 @@
+# registry.py
+# In-process registry of profile details - each account fetched once per batch
+
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ProfileRegistry:
+    """
+    Thread-safe cache of account details shared by all targets in a batch.
+    Concurrent requests for a username that is already being fetched wait
+    for that fetch instead of starting their own.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl  # Seconds before a cached profile is refetched (None = never)
+        self._entries = {}  # username -> (Future, fetched_at)
+        self._lock = threading.Lock()
+        self._last_purge = time.time()
+        self.stats = {
+            "requests": 0,
+            "fetches": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "failures": 0  # Requests that got None, as fetcher or waiter
+        }
+
+    def get(self, username, fetch):
+        """
+        Return details for username, calling fetch() only if no fresh entry
+        exists and no other thread is already fetching it.
+        fetch: zero-argument callable returning the details dict or None.
+        """
+        with self._lock:
+            now = time.time()
+            self.stats["requests"] += 1
+            self._purge_expired(now)
+            entry = self._entries.get(username)
+            waiting = False
+
+            if entry is not None:
+                future, fetched_at = entry
+                if not future.done():
+                    owner = False
+                    waiting = True  # Counted once the shared fetch resolves
+                elif not self._expired(fetched_at, now):
+                    self.stats["cache_hits"] += 1
+                    owner = False
+                else:
+                    entry = None
+
+            if entry is None:
+                future = Future()
+                self._entries[username] = (future, time.time())
+                self.stats["fetches"] += 1
+                owner = True
+
+        if not owner:
+            if waiting:
+                details = future.result()
+                with self._lock:
+                    # A waiter on a failed fetch saved nothing
+                    self.stats["coalesced" if details is not None else "failures"] += 1
+                return details
+            return future.result()
+
+        try:
+            details = fetch()
+        except Exception:
+            details = None
+
+        with self._lock:
+            if details is None:
+                # Don't cache failures; the next request retries
+                self.stats["failures"] += 1
+                self._entries.pop(username, None)
+            else:
+                self._entries[username] = (future, time.time())
+
+        future.set_result(details)
+        return details
+
+    def _expired(self, fetched_at, now):
+        return self.ttl is not None and now - fetched_at >= self.ttl
+
+    def _purge_expired(self, now):
+        """Drop stale entries, at most once per ttl (caller holds the lock)"""
+        if self.ttl is None or now - self._last_purge < self.ttl:
+            return
+
+        self._entries = {
+            username: (future, fetched_at)
+            for username, (future, fetched_at) in self._entries.items()
+            if not future.done() or not self._expired(fetched_at, now)
+        }
+        self._last_purge = now
+
+    @property
+    def fetches_saved(self):
+        return self.stats["cache_hits"] + self.stats["coalesced"]
+
+    def report(self):
+        """Stats dict including how many fetches deduplication saved"""
+        with self._lock:
+            return {
+                **self.stats,
+                "fetches_saved": self.fetches_saved,
+                "profiles_cached": len(self._entries)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
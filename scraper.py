@@ -4,30 +4,69 @@
 from playwright.sync_api import sync_playwright
 import time
 import config
+from registry import ProfileRegistry
 
-def scrape_following(username, password, target_username):
+
+class ScraperSession:
     """
-    Scrape following list from Instagram account.
-    Returns list of dicts: {username, bio, category, verified}
+    Logged-in browser session that can scrape several targets in a row.
+    Playwright's sync objects are bound to the thread that created them,
+    so open(), scrape() and close() must all run on the same thread.
     """
-    following_list = []
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
+
+    def __init__(self, username, password, headless=False, registry=None):
+        self.username = username
+        self.password = password
+        self.headless = headless
+        self.registry = registry  # Optional ProfileRegistry shared across targets
+        self._playwright = None
+        self.browser = None
+        self.page = None
+
+    def open(self):
+        """Launch the browser and log in once"""
+        self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch(headless=self.headless)
+        context = self.browser.new_context()
+        self.page = context.new_page()
+        
+        # Login
+        print("🔐 Logging into Instagram...")
+        self.page.goto("https://www.instagram.com/accounts/login/")
+        time.sleep(3)
+        
+        self.page.fill('input[name="username"]', self.username)
+        self.page.fill('input[name="password"]', self.password)
+        self.page.click('button[type="submit"]')
+        time.sleep(5)
+        
+        return self
+
+    def close(self):
+        """Close the browser and stop Playwright"""
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self._playwright:
+            self._playwright.stop()
+            self._playwright = None
+        self.page = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def scrape(self, target_username):
+        """
+        Scrape following list of target_username with the logged-in page.
+        Returns list of dicts: {username, bio, category, verified}
+        """
+        following_list = []
+        page = self.page
         
         try:
-            # Login
-            print("🔐 Logging into Instagram...")
-            page.goto("https://www.instagram.com/accounts/login/")
-            time.sleep(3)
-            
-            page.fill('input[name="username"]', username)
-            page.fill('input[name="password"]', password)
-            page.click('button[type="submit"]')
-            time.sleep(5)
-            
             # Navigate to target profile
             print(f"📍 Navigating to @{target_username}...")
             page.goto(f"https://www.instagram.com/{target_username}/")
@@ -42,57 +81,136 @@ def scrape_following(username, password, target_username):
             print("🔍 Scraping following list...")
             dialog = page.locator('div[role="dialog"]').first
             
-            # Scroll to load accounts
-            prev_count = 0
-            stale_count = 0
+            # Phase 1: collect usernames from the dialog
+            usernames = _collect_following_usernames(dialog, config.MAX_FOLLOWING_TO_SCRAPE)
+            print(f"  Found {len(usernames)} accounts, fetching details...")
             
-            while len(following_list) < config.MAX_FOLLOWING_TO_SCRAPE:
-                # Get all account elements
-                accounts = dialog.locator('a[href^="/"][role="link"]').all()
-                
-                for account in accounts:
-                    try:
-                        account_username = account.get_attribute("href").strip("/")
-                        
-                        # Skip if already processed
-                        if any(f["username"] == account_username for f in following_list):
-                            continue
-                        
-                        # Navigate to profile to get bio and category
-                        account_data = _get_account_details(page, account_username)
-                        
-                        if account_data:
-                            following_list.append(account_data)
-                            print(f"  ✓ {len(following_list)}: @{account_username}")
-                        
-                        if len(following_list) >= config.MAX_FOLLOWING_TO_SCRAPE:
-                            break
-                            
-                    except Exception as e:
-                        continue
+            # Phase 2: visit each profile for bio and category
+            for account_username in usernames:
+                account_data = self._account_details(account_username)
                 
-                # Check if stuck
-                if len(following_list) == prev_count:
-                    stale_count += 1
-                    if stale_count > 3:
-                        break
-                else:
-                    stale_count = 0
-                
-                prev_count = len(following_list)
-                
-                # Scroll
-                dialog.evaluate("el => el.scrollBy(0, 300)")
-                time.sleep(1)
+                if account_data:
+                    following_list.append(account_data)
+                    print(f"  ✓ {len(following_list)}: @{account_username}")
             
             print(f"\n✅ Scraped {len(following_list)} accounts")
             
         except Exception as e:
             print(f"❌ Error during scraping: {e}")
-        finally:
-            browser.close()
+        
+        return following_list
+
+    def _account_details(self, username):
+        if self.registry is None:
+            return _get_account_details(self.page, username)
+        
+        return self.registry.get(
+            username,
+            lambda: _get_account_details(self.page, username)
+        )
+
+
+# Runs in the page: returns hrefs not returned by an earlier call, then scrolls.
+# The seen-set lives on the dialog element so only new entries cross the wire.
+_HARVEST_JS = """(el, step) => {
+    const seen = el.__harvested || (el.__harvested = new Set());
+    const fresh = [];
+    for (const a of el.querySelectorAll('a[href^="/"][role="link"]')) {
+        const href = a.getAttribute('href');
+        if (!seen.has(href)) {
+            seen.add(href);
+            fresh.push(href);
+        }
+    }
+    el.scrollBy(0, step);
+    return fresh;
+}"""
+
+
+def _collect_following_usernames(dialog, limit):
+    """
+    Scroll the following dialog and collect up to `limit` usernames.
+    One evaluate() round trip per scroll; the step grows while scrolls keep
+    yielding new entries and shrinks when they don't.
+    """
+    usernames = []
+    seen = set()
+    step = config.SCROLL_STEP_MIN
+    stale_count = 0
+    
+    while len(usernames) < limit:
+        hrefs = dialog.evaluate(_HARVEST_JS, step)
+        
+        new_count = 0
+        for href in hrefs:
+            username = href.strip("/")
+            
+            # Profile links only (skip /explore/..., /p/... etc.)
+            if not username or "/" in username or username in seen:
+                continue
+            
+            seen.add(username)
+            usernames.append(username)
+            new_count += 1
+            
+            if len(usernames) >= limit:
+                break
+        
+        if new_count:
+            stale_count = 0
+            step = min(step * 2, config.SCROLL_STEP_MAX)
+            time.sleep(config.SCROLL_PAUSE)
+        else:
+            # Probably waiting on lazy-load; scroll gently and give it time
+            stale_count += 1
+            if stale_count > 3:
+                break
+            step = max(step // 2, config.SCROLL_STEP_MIN)
+            time.sleep(config.SCROLL_STALE_PAUSE)
+    
+    return usernames
+
+
+def scrape_following(username, password, target_username):
+    """
+    Scrape following list from Instagram account.
+    Returns list of dicts: {username, bio, category, verified}
+    """
+    session = ScraperSession(username, password)
+    
+    try:
+        session.open()
+        return session.scrape(target_username)
+    except Exception as e:
+        print(f"❌ Error during scraping: {e}")
+        return []
+    finally:
+        session.close()
+
+
+def scrape_following_batch(username, password, target_usernames):
+    """
+    Scrape several targets with one login, fetching each followed
+    account's profile only once across the whole batch.
+    Returns: {target_username: following_list}
+    """
+    registry = ProfileRegistry()
+    session = ScraperSession(username, password, registry=registry)
+    results = {}
+    
+    try:
+        session.open()
+        for target_username in target_usernames:
+            results[target_username] = session.scrape(target_username)
+    except Exception as e:
+        print(f"❌ Error during scraping: {e}")
+    finally:
+        session.close()
+    
+    stats = registry.report()
+    print(f"♻️  Profile fetches: {stats['fetches']}, saved by dedup: {stats['fetches_saved']}")
     
-    return following_list
+    return results
 
 
 def _get_account_details(page, username):
@@ -0,0 +1,430 @@
+# server.py
+# Long-running HTTP service - queues analysis jobs for a pool of warm workers
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # Headless service, no display
+
+import config
+from classifier import classify_all_accounts
+from vectorizer import compute_all_metrics, jsonable
+from inference import generate_full_report
+from visualization import render_chart_bytes
+from registry import ProfileRegistry
+from cascade import ModelCascade, get_default_cascade
+
+# pyplot keeps global state, so only one worker may draw at a time
+_chart_lock = threading.Lock()
+
+HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def run_analysis(session, target_username, llm=None):
+    """
+    Run the full pipeline for one target on an already-open scraper session.
+    Blocking - called from a worker thread.
+    Returns: (result dict, {chart_name: png_bytes})
+    """
+    following_accounts = session.scrape(target_username)
+
+    if not following_accounts:
+        raise RuntimeError("No accounts found or scraping failed")
+
+    classified_accounts = classify_all_accounts(following_accounts, llm)
+
+    results = compute_all_metrics(classified_accounts)
+    interest_vector = results['interest_vector']
+    metrics = results['metrics']
+
+    report = generate_full_report(interest_vector, metrics, llm)
+
+    with _chart_lock:
+        charts = render_chart_bytes(interest_vector)
+
+    result = {
+        "interest_vector": interest_vector,
+        "metrics": metrics,
+        "report": report,
+        "accounts_analyzed": len(classified_accounts)
+    }
+
+    return result, charts
+
+
+class Job:
+    """A single queued analysis request"""
+
+    def __init__(self, target_username):
+        self.id = uuid.uuid4().hex
+        self.target_username = target_username
+        self.status = "queued"  # queued -> running -> done | failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.result = None
+        self.charts = {}
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "target_username": self.target_username,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "charts": sorted(self.charts)
+        }
+
+
+class AnalysisService:
+    """
+    Bounded job queue drained by a fixed number of workers.
+    Each worker owns one thread and one scraper session, so the browser
+    stays logged in between jobs. The LLM client is shared by all workers.
+    """
+
+    def __init__(self, session_factory, llm=None,
+                 workers=config.SERVICE_WORKERS,
+                 queue_size=config.SERVICE_QUEUE_SIZE,
+                 job_history=config.SERVICE_JOB_HISTORY,
+                 registry=None,
+                 archive=None):
+        self.session_factory = session_factory
+        self.llm = llm
+        self.registry = registry  # ProfileRegistry shared by the sessions, if any
+        self.archive = archive  # ResultArchiveWriter for finished jobs, if any
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.job_history = job_history
+        self.jobs = OrderedDict()
+        self.queue = None
+        self._workers = []
+        self.counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0
+        }
+        self._total_run_seconds = 0.0
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i))
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, target_username):
+        """Queue a job. Raises asyncio.QueueFull when the queue is at capacity."""
+        job = Job(target_username)
+
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise
+
+        self.jobs[job.id] = job
+        self.counters["submitted"] += 1
+        self._evict_finished()
+
+        return job
+
+    def metrics(self):
+        running = sum(1 for job in self.jobs.values() if job.status == "running")
+        finished = self.counters["completed"] + self.counters["failed"]
+
+        metrics = {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.queue_size,
+            "running": running,
+            "workers": self.worker_count,
+            **self.counters,
+            "avg_job_seconds": round(self._total_run_seconds / finished, 3) if finished else 0.0
+        }
+
+        if self.registry is not None:
+            metrics["profile_registry"] = self.registry.report()
+        if isinstance(self.llm, ModelCascade):
+            metrics["model_tiers"] = self.llm.report()
+
+        return metrics
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs once history exceeds its limit"""
+        excess = len(self.jobs) - self.job_history
+
+        for job_id in list(self.jobs):
+            if excess <= 0:
+                break
+            if self.jobs[job_id].finished:
+                del self.jobs[job_id]
+                excess -= 1
+
+    async def _worker(self, index):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"analysis-{index}")
+        session = None
+
+        try:
+            while True:
+                job = await self.queue.get()
+                job.status = "running"
+                job.started_at = time.time()
+
+                try:
+                    if session is None:
+                        session = self.session_factory()
+                        await loop.run_in_executor(executor, session.open)
+
+                    job.result, job.charts = await loop.run_in_executor(
+                        executor, run_analysis, session, job.target_username, self.llm
+                    )
+                    job.status = "done"
+                    self.counters["completed"] += 1
+
+                except Exception as e:
+                    job.status = "failed"
+                    job.error = str(e)
+                    self.counters["failed"] += 1
+
+                    # Start the next job with a fresh browser
+                    if session is not None:
+                        await loop.run_in_executor(executor, session.close)
+                        session = None
+
+                finally:
+                    job.finished_at = time.time()
+                    self._total_run_seconds += job.finished_at - job.started_at
+                    self.queue.task_done()
+
+                if job.status == "done" and self.archive is not None:
+                    await self._archive_job(loop, job)
+
+        finally:
+            if session is not None:
+                await loop.run_in_executor(executor, session.close)
+            executor.shutdown(wait=False)
+
+    async def _archive_job(self, loop, job):
+        """Append a finished job to the archive; failures are only logged"""
+        try:
+            await loop.run_in_executor(
+                None, self.archive.append,
+                job.target_username,
+                job.result["interest_vector"],
+                job.result["metrics"]
+            )
+        except Exception as e:
+            print(f"⚠️ Could not archive job {job.id}: {e}")
+
+    # HTTP layer
+
+    async def handle_connection(self, reader, writer):
+        try:
+            method, path, raw_body = await self._read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            # Malformed request line, headers or body
+            status, content_type, body = _json_response(400, {"error": f"Bad request: {e}"})
+        else:
+            try:
+                status, content_type, body = self.route(method, path, raw_body)
+            except Exception as e:
+                print(f"❌ Error handling {method} {path}: {e}")
+                status, content_type, body = _json_response(500, {"error": "Internal server error"})
+
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        Read one HTTP request.
+        Returns: (method, path, raw_body); raises ValueError if malformed
+        """
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, path, _ = request_line.split(" ", 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length < 0:
+            raise ValueError("negative Content-Length")
+        raw_body = await reader.readexactly(length) if length else b""
+
+        return method, path.split("?", 1)[0], raw_body
+
+    def route(self, method, path, raw_body=b""):
+        """
+        Dispatch one request.
+        Returns: (status, content_type, body_bytes)
+        """
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["health"]:
+            return _json_response(200, {"status": "ok"})
+
+        if parts == ["metrics"]:
+            return _json_response(200, self.metrics())
+
+        if parts == ["jobs"]:
+            if method != "POST":
+                return _json_response(405, {"error": "Use POST to submit a job"})
+
+            try:
+                payload = json.loads(raw_body or b"{}")
+            except ValueError:
+                return _json_response(400, {"error": "Body must be JSON"})
+            if not isinstance(payload, dict):
+                return _json_response(400, {"error": "Body must be a JSON object"})
+
+            target_username = str(payload.get("target_username", "")).strip().lstrip("@")
+            if not target_username:
+                return _json_response(400, {"error": "target_username required"})
+
+            try:
+                job = self.submit(target_username)
+            except asyncio.QueueFull:
+                return _json_response(503, {"error": "Job queue is full"})
+
+            return _json_response(202, job.to_dict())
+
+        if not parts or parts[0] != "jobs" or method != "GET":
+            return _json_response(404, {"error": "Not found"})
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return _json_response(404, {"error": "Unknown job"})
+
+        if len(parts) == 2:
+            return _json_response(200, job.to_dict())
+
+        if not job.finished:
+            return _json_response(409, {"error": f"Job is {job.status}"})
+
+        if parts[2:] == ["result"]:
+            if job.status == "failed":
+                return _json_response(409, {"error": job.error})
+            return _json_response(200, {**job.to_dict(), **job.result})
+
+        if len(parts) == 4 and parts[2] == "charts":
+            chart = job.charts.get(parts[3].replace(".png", ""))
+            if chart is None:
+                return _json_response(404, {"error": "Unknown chart"})
+            return 200, "image/png", chart
+
+        return _json_response(404, {"error": "Not found"})
+
+
+def _json_response(status, payload):
+    body = json.dumps(jsonable(payload), default=str)
+    return status, "application/json", body.encode("utf-8")
+
+
+async def serve(service, host=config.SERVICE_HOST, port=config.SERVICE_PORT):
+    """Run the service until cancelled"""
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+
+    print(f"🌐 Listening on http://{host}:{port} ({service.worker_count} workers)")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instagram interest analysis HTTP service")
+    parser.add_argument("--host", default=config.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVICE_WORKERS)
+    parser.add_argument("--stub", action="store_true",
+                        help="Use the offline stub scraper and model (no browser, no API calls)")
+    args = parser.parse_args()
+
+    # Popular accounts are fetched once and shared by all workers
+    registry = ProfileRegistry(ttl=config.PROFILE_CACHE_TTL)
+
+    if args.stub:
+        from stubs import StubScraperSession, StubModel
+        session_factory = lambda: StubScraperSession(registry=registry)
+        llm = ModelCascade([
+            ("stub-fast", StubModel(confidence=0.5)),
+            ("stub-large", StubModel(confidence=0.9))
+        ])
+    else:
+        from scraper import ScraperSession
+        session_factory = lambda: ScraperSession(
+            config.INSTAGRAM_USERNAME,
+            config.INSTAGRAM_PASSWORD,
+            headless=True,
+            registry=registry
+        )
+        llm = get_default_cascade()
+
+    archive = None
+    if config.RESULT_ARCHIVE_DIR:
+        from archive import ResultArchiveWriter
+        archive = ResultArchiveWriter(config.RESULT_ARCHIVE_DIR)
+
+    service = AnalysisService(
+        session_factory, llm,
+        workers=args.workers,
+        registry=registry,
+        archive=archive
+    )
+
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n⚠️ Service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# stubs.py
+# Offline stand-ins for the Instagram scraper and Gemini model - for testing only
+
+import hashlib
+import json
+import config
+
+
+def _seed(text):
+    """Stable integer derived from text (unlike hash(), not salted per process)"""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16)
+
+
+class StubScraperSession:
+    """
+    Drop-in replacement for scraper.ScraperSession.
+    Returns a deterministic, fake following list without a browser.
+    Every fourth account is drawn from a small pool of "popular" accounts
+    shared by all targets, so a ProfileRegistry has something to dedupe.
+    """
+
+    POPULAR_ACCOUNTS = 10
+
+    def __init__(self, username=None, password=None, following_count=None, registry=None):
+        self.following_count = following_count or min(config.MAX_FOLLOWING_TO_SCRAPE, 20)
+        self.registry = registry
+        self.is_open = False
+        self.fetches = 0
+
+    def open(self):
+        self.is_open = True
+        return self
+
+    def close(self):
+        self.is_open = False
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def scrape(self, target_username):
+        """Returns list of dicts: {username, bio, category, verified}"""
+        seed = _seed(target_username)
+        following_list = []
+
+        for i in range(self.following_count):
+            if i % 4 == 0:
+                username = f"popular_{(seed + i) % self.POPULAR_ACCOUNTS}"
+            else:
+                username = f"{target_username}_follow_{i}"
+
+            if self.registry is None:
+                account = self._fetch(username)
+            else:
+                account = self.registry.get(username, lambda: self._fetch(username))
+
+            if account:
+                following_list.append(account)
+
+        return following_list
+
+    def _fetch(self, username):
+        """Fake profile details derived from the username alone"""
+        self.fetches += 1
+        categories = config.ALLOWED_CATEGORIES[:-1]  # Skip "Other"
+        seed = _seed(username)
+        category = categories[seed % len(categories)]
+
+        return {
+            "username": username,
+            "bio": f"All about {category.lower()}",
+            "category": category if seed % 3 else None,
+            "verified": seed % 5 == 0
+        }
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """
+    Drop-in replacement for genai.GenerativeModel.
+    Answers classification prompts with JSON built from the prompt itself,
+    and summary prompts with a fixed probabilistic sentence.
+    """
+
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+
+        if "primary_category" not in prompt:
+            return _StubResponse(
+                "The interest distribution suggests engagement across several domains."
+            )
+
+        # Pick the first allowed category named in the account's bio/category
+        account_part = prompt.split("ALLOWED CATEGORIES")[0].lower()
+        primary = next(
+            (c for c in config.ALLOWED_CATEGORIES if c.lower() in account_part),
+            "Other"
+        )
+        has_category = "instagram category: null" not in account_part
+
+        result = {
+            "primary_category": primary,
+            "secondary_category": None,
+            "signals": {
+                "from_instagram_category": self.confidence if has_category else 0.0,
+                "from_bio": self.confidence
+            },
+            "confidence": self.confidence
+        }
+
+        return _StubResponse(json.dumps(result))
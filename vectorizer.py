@@ -25,6 +25,33 @@ def fuse_signals(classification):
     return final_signal
 
 
+def add_account_to_vector(interest_vector, classification):
+    """
+    Add one account's weighted categories to a raw (unnormalized) vector.
+    """
+    final_signal = fuse_signals(classification)
+    
+    # Add primary category
+    primary = classification["primary_category"]
+    interest_vector[primary] += config.PRIMARY_WEIGHT * final_signal
+    
+    # Add secondary category if exists
+    secondary = classification.get("secondary_category")
+    if secondary and secondary != "null":
+        interest_vector[secondary] += config.SECONDARY_WEIGHT * final_signal
+
+
+def normalize_interest_vector(interest_vector):
+    """
+    Normalize raw category weights to percentages.
+    """
+    total = sum(interest_vector.values())
+    if total > 0:
+        interest_vector = {k: (v / total) * 100 for k, v in interest_vector.items()}
+    
+    return dict(interest_vector)
+
+
 def build_interest_vector(classified_accounts):
     """
     Build interest vector with weighted categories.
@@ -33,24 +60,10 @@ def build_interest_vector(classified_accounts):
     interest_vector = defaultdict(float)
     
     for account in classified_accounts:
-        classification = account["classification"]
-        final_signal = fuse_signals(classification)
-        
-        # Add primary category
-        primary = classification["primary_category"]
-        interest_vector[primary] += config.PRIMARY_WEIGHT * final_signal
-        
-        # Add secondary category if exists
-        secondary = classification.get("secondary_category")
-        if secondary and secondary != "null":
-            interest_vector[secondary] += config.SECONDARY_WEIGHT * final_signal
+        add_account_to_vector(interest_vector, account["classification"])
     
     # Normalize to percentages
-    total = sum(interest_vector.values())
-    if total > 0:
-        interest_vector = {k: (v / total) * 100 for k, v in interest_vector.items()}
-    
-    return dict(interest_vector)
+    return normalize_interest_vector(interest_vector)
 
 
 def calculate_shannon_entropy(interest_vector):
@@ -129,6 +142,18 @@ def calculate_skewness(interest_vector):
     return round(skew, 3)
 
 
+def compute_metrics_from_vector(interest_vector, celebrity_ratio):
+    """
+    Compute the metrics dict for an already-built interest vector.
+    """
+    return {
+        "diversity_index": calculate_shannon_entropy(interest_vector),
+        "knowledge_entertainment_ratio": calculate_knowledge_entertainment_ratio(interest_vector),
+        "celebrity_ratio": celebrity_ratio,
+        "skewness": calculate_skewness(interest_vector)
+    }
+
+
 def compute_all_metrics(classified_accounts):
     """
     Compute complete metrics package.
@@ -138,12 +163,10 @@ def compute_all_metrics(classified_accounts):
     
     interest_vector = build_interest_vector(classified_accounts)
     
-    metrics = {
-        "diversity_index": calculate_shannon_entropy(interest_vector),
-        "knowledge_entertainment_ratio": calculate_knowledge_entertainment_ratio(interest_vector),
-        "celebrity_ratio": calculate_celebrity_ratio(classified_accounts),
-        "skewness": calculate_skewness(interest_vector)
-    }
+    metrics = compute_metrics_from_vector(
+        interest_vector,
+        calculate_celebrity_ratio(classified_accounts)
+    )
     
     print("✅ Metrics computed\n")
     
@@ -151,3 +174,17 @@ def compute_all_metrics(classified_accounts):
         "interest_vector": interest_vector,
         "metrics": metrics
     }
+
+
+def jsonable(value):
+    """
+    Replace inf (a valid knowledge/entertainment ratio) with None,
+    recursively, so results serialize to strict JSON.
+    """
+    if isinstance(value, float) and math.isinf(value):
+        return None
+    if isinstance(value, dict):
+        return {k: jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    return value
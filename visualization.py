@@ -1,6 +1,7 @@
 # visualization.py
 # Matplotlib visualizations - bar chart and radar chart
 
+import io
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -31,7 +32,8 @@ def create_bar_chart(interest_vector, output_path="interest_bar.png"):
     plt.grid(axis='y', alpha=0.3)
     
     plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    print(f"  ✓ Bar chart saved: {output_path}")
+    if isinstance(output_path, str):
+        print(f"  ✓ Bar chart saved: {output_path}")
     plt.close()
 
 
@@ -79,7 +81,8 @@ def create_radar_chart(interest_vector, output_path="interest_radar.png"):
     
     plt.tight_layout()
     plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    print(f"  ✓ Radar chart saved: {output_path}")
+    if isinstance(output_path, str):
+        print(f"  ✓ Radar chart saved: {output_path}")
     plt.close()
 
 
@@ -93,3 +96,18 @@ def create_all_visualizations(interest_vector):
     create_radar_chart(interest_vector)
     
     print("✅ Visualizations complete\n")
+
+
+def render_chart_bytes(interest_vector):
+    """
+    Render both charts in memory.
+    Returns: {"bar": png_bytes, "radar": png_bytes}
+    """
+    charts = {}
+    
+    for name, create in (("bar", create_bar_chart), ("radar", create_radar_chart)):
+        buffer = io.BytesIO()
+        create(interest_vector, output_path=buffer)
+        charts[name] = buffer.getvalue()
+    
+    return charts